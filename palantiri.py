@@ -3,25 +3,31 @@
 Camera → n8n bridge
 Forwards camera frames to an n8n webhook on demand, controlled via REST API.
 
-REST API (default port 8080):
+REST API (default port 8080, served by aiohttp on an asyncio event loop):
   GET  /health  — camera status and readiness
+  GET  /stream  — MJPEG live preview (multipart/x-mixed-replace)
   POST /start   — begin streaming frames to n8n
   POST /stop    — stop streaming
+  POST /clip    — export the frames around "now" from the ring buffer to MinIO
 
-Requires: pip3 install picamera2 opencv-python-headless numpy flask requests
+Requires: pip3 install picamera2 opencv-python-headless numpy aiohttp requests
 """
 
+import asyncio
+import io
 import logging
+import math
 import threading
 import time
+import zipfile
 from datetime import datetime
 
 import boto3
 import cv2
 import requests
+from aiohttp import web
 from botocore.client import Config
 from botocore.exceptions import ClientError
-from flask import Flask, jsonify
 from picamera2 import Picamera2
 
 # ── n8n config ────────────────────────────────────────────────
@@ -47,6 +53,14 @@ WARMUP_FRAMES = 10
 # ── Sender config ─────────────────────────────────────────────
 SEND_INTERVAL = 0.2  # 5 fps
 REST_PORT = 8080
+STREAM_STALL_TIMEOUT = 5.0  # end /stream responses when no frame arrives for this long
+
+# ── Ring buffer / clip config ─────────────────────────────────
+RING_SECONDS = 30.0  # history kept in memory
+RING_MAX_BYTES = 96 * 1024 * 1024  # preallocated once at startup
+RING_MAX_FRAMES = int(RING_SECONDS / SEND_INTERVAL) + 1
+CLIP_PRE_SECONDS = 10.0
+CLIP_POST_SECONDS = 10.0
 
 # ─────────────────────────────────────────────────────────────
 
@@ -57,13 +71,98 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-app = Flask(__name__)
-
 _lock = threading.Lock()
 _camera_ready = False
 _last_lores_ts = 0.0
 _sending_active = False
 
+# Live preview state, only touched on the event loop thread.  The camera thread
+# hands each new JPEG over via call_soon_threadsafe; every /stream viewer writes
+# that same bytes object, so frames are never re-encoded or copied per client.
+_loop: asyncio.AbstractEventLoop | None = None
+_latest_jpeg = b""
+_frame_ready = asyncio.Event()
+_viewers = 0
+_stopping = False
+_background: set[asyncio.Task] = set()
+
+MJPEG_BOUNDARY = "frame"
+
+
+class FrameRing:
+    """Fixed-size in-memory history of encoded frames.
+
+    All frame bytes live in one ``bytearray`` allocated up front and are
+    written into it back to back, wrapping to the start when the end is
+    reached.  Slot metadata is kept in preallocated lists, so pushing a frame
+    never allocates.  The oldest frames are evicted when their bytes are about
+    to be overwritten, when they are older than *seconds*, or when all
+    *max_frames* slots are in use.
+    """
+
+    def __init__(self, seconds: float, max_bytes: int, max_frames: int) -> None:
+        self.seconds = seconds
+        self._buf = bytearray(max_bytes)
+        self._view = memoryview(self._buf)
+        self._offsets = [0] * max_frames
+        self._lengths = [0] * max_frames
+        self._stamps = [0.0] * max_frames
+        self._oldest = 0  # slot index of the oldest frame
+        self._count = 0
+        self._write_pos = 0
+        self._lock = threading.Lock()
+
+    def _evict_oldest(self) -> None:
+        self._oldest = (self._oldest + 1) % len(self._offsets)
+        self._count -= 1
+
+    def push(self, ts: float, data: bytes) -> bool:
+        """Copy *data* into the ring, stamped with *ts*.  Returns False if it cannot fit."""
+        size = len(data)
+        if size > len(self._buf):
+            return False
+
+        with self._lock:
+            start = self._write_pos
+            if start + size > len(self._buf):
+                # Wrap around: everything in the unused tail is older than what
+                # sits at the start of the buffer, so it has to go first.
+                while self._count and self._offsets[self._oldest] >= start:
+                    self._evict_oldest()
+                start = 0
+            end = start + size
+
+            while self._count and (
+                start <= self._offsets[self._oldest] < end
+                or self._stamps[self._oldest] < ts - self.seconds
+                or self._count == len(self._offsets)
+            ):
+                self._evict_oldest()
+
+            slot = (self._oldest + self._count) % len(self._offsets)
+            self._view[start:end] = data
+            self._offsets[slot] = start
+            self._lengths[slot] = size
+            self._stamps[slot] = ts
+            self._count += 1
+            self._write_pos = end
+        return True
+
+    def snapshot(self, since: float, until: float) -> list[tuple[float, bytes]]:
+        """Return copies of all buffered frames with ``since <= ts <= until``, oldest first."""
+        frames: list[tuple[float, bytes]] = []
+        with self._lock:
+            for i in range(self._count):
+                slot = (self._oldest + i) % len(self._offsets)
+                ts = self._stamps[slot]
+                if since <= ts <= until:
+                    start = self._offsets[slot]
+                    frames.append((ts, bytes(self._view[start : start + self._lengths[slot]])))
+        return frames
+
+
+_ring = FrameRing(RING_SECONDS, RING_MAX_BYTES, RING_MAX_FRAMES)
+
 
 def capture_jpeg(cam: Picamera2) -> bytes:
     frame = cam.capture_array("main")
@@ -99,13 +198,13 @@ def make_s3():
     )
 
 
-def upload_to_minio(s3, image_bytes: bytes, key: str) -> bool:
+def upload_to_minio(s3, image_bytes: bytes, key: str, content_type: str = "image/jpeg") -> bool:
     try:
         s3.put_object(
             Bucket=BUCKET,
             Key=key,
             Body=image_bytes,
-            ContentType="image/jpeg",
+            ContentType=content_type,
         )
         log.info(f"Uploaded → {BUCKET}/{key}  ({len(image_bytes) // 1024} KB)")
         return True
@@ -116,43 +215,158 @@ def upload_to_minio(s3, image_bytes: bytes, key: str) -> bool:
         return False
 
 
+def pack_clip(frames: list[tuple[float, bytes]]) -> bytes:
+    """Bundle *frames* into a single uncompressed zip (JPEGs don't deflate)."""
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+        for ts, jpeg in frames:
+            name = datetime.fromtimestamp(ts).strftime("%Y%m%d_%H-%M-%S_%f")[:-3]
+            zf.writestr(f"{name}.jpg", jpeg)
+    return out.getvalue()
+
+
+def export_clip(trigger_ts: float, pre: float, post: float, key: str) -> None:
+    """Upload the buffered frames from *pre* seconds before to *post* seconds after *trigger_ts*."""
+    frames = _ring.snapshot(trigger_ts - pre, trigger_ts + post)
+    if not frames:
+        log.error(f"Clip {key}: no frames buffered around trigger")
+        return
+    log.info(f"Clip {key}: {len(frames)} frames, {pre}s before / {post}s after")
+    upload_to_minio(make_s3(), pack_clip(frames), key, content_type="application/zip")
+
+
+# ── Live preview ──────────────────────────────────────────────
+
+
+def _publish_frame(jpeg: bytes) -> None:
+    """Make *jpeg* the latest preview frame and wake all viewers (event loop only)."""
+    global _latest_jpeg, _frame_ready
+    _latest_jpeg = jpeg
+    _frame_ready.set()
+    _frame_ready = asyncio.Event()
+
+
+def publish_frame(jpeg: bytes) -> None:
+    """Thread-safe entry point used by the camera loop."""
+    if _loop is not None and _viewers:
+        _loop.call_soon_threadsafe(_publish_frame, jpeg)
+
+
+async def _export_clip_later(trigger_ts: float, pre: float, post: float, key: str) -> None:
+    await asyncio.sleep(max(0.0, trigger_ts + post - time.time()))
+    await asyncio.to_thread(export_clip, trigger_ts, pre, post, key)
+
+
 # ── REST endpoints ────────────────────────────────────────────
 
+routes = web.RouteTableDef()
+
 
-@app.route("/health", methods=["GET"])
-def health():
+@routes.get("/health")
+async def health(request: web.Request) -> web.Response:
     with _lock:
         ready = _camera_ready
         last_ts = _last_lores_ts
         sending = _sending_active
     age = round(time.time() - last_ts, 2) if last_ts else None
     ok = ready and age is not None and age < 2.0
-    return jsonify(
+    return web.json_response(
         {
             "status": "ok" if ok else "degraded",
             "camera_ready": ready,
             "sending": sending,
             "last_frame_age_seconds": age,
+            "viewers": _viewers,
         }
     )
 
 
-@app.route("/start", methods=["POST"])
-def start_sending():
+@routes.post("/start")
+async def start_sending(request: web.Request) -> web.Response:
     global _sending_active
     with _lock:
         _sending_active = True
     log.info("Sending STARTED")
-    return jsonify({"sending": True})
+    return web.json_response({"sending": True})
 
 
-@app.route("/stop", methods=["POST"])
-def stop_sending():
+@routes.post("/stop")
+async def stop_sending(request: web.Request) -> web.Response:
     global _sending_active
     with _lock:
         _sending_active = False
     log.info("Sending STOPPED")
-    return jsonify({"sending": False})
+    return web.json_response({"sending": False})
+
+
+@routes.post("/clip")
+async def clip(request: web.Request) -> web.Response:
+    trigger_ts = time.time()
+    body = {}
+    if request.can_read_body:
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "body must be valid JSON"}, status=400)
+    if not isinstance(body, dict):
+        return web.json_response({"error": "body must be a JSON object"}, status=400)
+    try:
+        pre = float(body.get("pre", CLIP_PRE_SECONDS))
+        post = float(body.get("post", CLIP_POST_SECONDS))
+    except (TypeError, ValueError):
+        return web.json_response({"error": "pre and post must be numbers"}, status=400)
+    if not (math.isfinite(pre) and math.isfinite(post)):
+        return web.json_response({"error": "pre and post must be finite"}, status=400)
+    if pre < 0 or post < 0 or pre + post > RING_SECONDS:
+        return web.json_response(
+            {"error": f"pre and post must be >= 0 and sum to <= {RING_SECONDS}s"}, status=400
+        )
+
+    ts = datetime.fromtimestamp(trigger_ts).strftime("%Y%m%d/%Y%m%d_%H-%M-%S_%f")[:-3]
+    key = f"{PREFIX}/clips/{ts}.zip"
+    task = asyncio.create_task(_export_clip_later(trigger_ts, pre, post, key))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    log.info(f"Clip requested → {key}")
+    return web.json_response({"clip": key, "pre": pre, "post": post}, status=202)
+
+
+@routes.get("/stream")
+async def stream(request: web.Request) -> web.StreamResponse:
+    global _viewers
+    resp = web.StreamResponse(
+        headers={
+            "Content-Type": f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+            "Cache-Control": "no-cache",
+        }
+    )
+    await resp.prepare(request)
+    _viewers += 1
+    log.info(f"Stream viewer connected ({_viewers} total)")
+    try:
+        while not _stopping:
+            # A viewer that is still draining the previous frame simply misses
+            # the ones published meanwhile and picks up the newest next time.
+            try:
+                await asyncio.wait_for(_frame_ready.wait(), timeout=STREAM_STALL_TIMEOUT)
+            except TimeoutError:
+                log.warning(f"No frame for {STREAM_STALL_TIMEOUT}s — closing stream")
+                break
+            if _stopping:
+                break
+            jpeg = _latest_jpeg
+            await resp.write(
+                f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+            )
+            await resp.write(jpeg)
+            await resp.write(b"\r\n")
+    except ConnectionResetError:
+        pass
+    finally:
+        _viewers -= 1
+        log.info(f"Stream viewer disconnected ({_viewers} left)")
+    return resp
 
 
 # ── Camera loop ───────────────────────────────────────────────
@@ -181,7 +395,7 @@ def camera_loop():
         _camera_ready = True
     log.info("Camera ready — REST API is accepting requests.")
 
-    last_send = 0.0
+    last_buffered = 0.0
 
     try:
         while True:
@@ -193,13 +407,19 @@ def camera_loop():
                 _last_lores_ts = now
                 should_send = _sending_active
 
-            if should_send and (now - last_send) >= SEND_INTERVAL:
+            # Full-res frames are always encoded into the ring buffer so /clip
+            # can reach back in time; the same JPEG is reused for sending.
+            if (now - last_buffered) >= SEND_INTERVAL:
                 jpeg = capture_jpeg(cam)
-                # send_to_n8n(jpeg)
-                ts = datetime.now().strftime("%Y%m%d/%Y%m%d_%H-%M-%S_%f")[:-3]
-                key = f"{PREFIX}/{ts}.jpg"
-                upload_to_minio(s3, jpeg, key)
-                last_send = now
+                _ring.push(now, jpeg)
+                publish_frame(jpeg)
+                last_buffered = now
+
+                if should_send:
+                    # send_to_n8n(jpeg)
+                    ts = datetime.now().strftime("%Y%m%d/%Y%m%d_%H-%M-%S_%f")[:-3]
+                    key = f"{PREFIX}/{ts}.jpg"
+                    upload_to_minio(s3, jpeg, key)
 
             time.sleep(0.1)
 
@@ -210,10 +430,30 @@ def camera_loop():
         log.info("Camera stopped.")
 
 
-def main():
+async def _start_camera(app: web.Application) -> None:
+    global _loop
+    _loop = asyncio.get_running_loop()
     threading.Thread(target=camera_loop, daemon=True, name="camera").start()
+
+
+async def _close_streams(app: web.Application) -> None:
+    """Wake all /stream viewers so they return instead of delaying shutdown."""
+    global _stopping
+    _stopping = True
+    _frame_ready.set()
+
+
+def make_app() -> web.Application:
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(_start_camera)
+    app.on_shutdown.append(_close_streams)
+    return app
+
+
+def main():
     log.info(f"REST API on http://0.0.0.0:{REST_PORT}")
-    app.run(host="0.0.0.0", port=REST_PORT, use_reloader=False)
+    web.run_app(make_app(), host="0.0.0.0", port=REST_PORT, print=None)
 
 
 if __name__ == "__main__":
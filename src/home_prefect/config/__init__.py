@@ -1,5 +1,5 @@
 """Application configuration."""
 
-from home_prefect.config.settings import Settings, get_settings
+from home_prefect.config.settings import Settings, TargetGroup, get_settings
 
-__all__ = ["Settings", "get_settings"]
+__all__ = ["Settings", "TargetGroup", "get_settings"]
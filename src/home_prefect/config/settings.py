@@ -1,11 +1,25 @@
 """Central application settings loaded from environment variables / .env file."""
 
 from functools import lru_cache
+from pathlib import Path
 
-from pydantic import Field
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class TargetGroup(BaseModel):
+    """A host plus the HTTP endpoints served by it, checked together.
+
+    When ``ping`` is enabled the host is pinged once and its result is reused
+    for every endpoint: if the host is down the HTTP checks are skipped.
+    """
+
+    name: str = Field(description="Unique name used to select the group.")
+    host: str = Field(description="IP address or hostname shared by all endpoints.")
+    ping: bool = Field(default=True, description="Ping the host before the HTTP checks.")
+    endpoints: list[str] = Field(default_factory=list, description="HTTP(S) URLs to probe.")
+
+
 class Settings(BaseSettings):
     """All tuneable parameters, sourced from environment or a .env file."""
 
@@ -22,9 +36,38 @@ class Settings(BaseSettings):
         description="URL of the Prefect API this process connects to.",
     )
 
+    # ── Network health ───────────────────────────────────────────────────────
+    target_groups: list[TargetGroup] = Field(
+        default_factory=lambda: [TargetGroup(name="router", host="192.168.1.1")],
+        description="Hosts and endpoints probed by the network health check (JSON in env).",
+    )
+    dns_cache_ttl: float = Field(
+        default=300.0,
+        description="Seconds a resolved hostname is reused by the network tasks.",
+    )
+
+    # ── Result history ───────────────────────────────────────────────────────
+    history_enabled: bool = Field(
+        default=True,
+        description="Record health-check and compose results in the history store.",
+    )
+    history_db: Path = Field(
+        default=Path("~/.local/share/home-prefect/history.db"),
+        description="SQLite file of the result history.",
+    )
+
     # ── Application ──────────────────────────────────────────────────────────
     log_level: str = Field(default="INFO", description="Root log level.")
 
+    @field_validator("target_groups")
+    @classmethod
+    def _unique_group_names(cls, groups: list[TargetGroup]) -> list[TargetGroup]:
+        names = [g.name for g in groups]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate target group names: {', '.join(duplicates)}")
+        return groups
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -11,14 +11,14 @@ from home_prefect.flows.network_health_flows import network_health_check
 
 
 def main() -> None:
-    """Register all network-related deployments."""
+    """Register all network-related deployments.
+
+    Targets come from ``Settings.target_groups`` (``TARGET_GROUPS`` in the
+    environment) of the process serving the deployment.
+    """
     health_deployment = network_health_check.to_deployment(
         name="network-health-check-hourly",
         cron="0 * * * *",  # every hour
-        parameters={
-            "hosts": ["192.168.1.1"],
-            "endpoints": [],
-        },
         tags=["network", "monitoring"],
     )
     serve(health_deployment)
@@ -1,16 +1,19 @@
 """Docker Compose maintenance flow."""
 
+import time
 from enum import Enum
 from pathlib import Path
 
 from prefect import flow
 from prefect.logging import get_run_logger
 
+from home_prefect.history import Sample
 from home_prefect.tasks.docker_tasks import (
     docker_compose_down,
     docker_compose_pull,
     docker_compose_up,
 )
+from home_prefect.tasks.history_tasks import record_results
 
 
 class ComposeAction(str, Enum):
@@ -21,26 +24,13 @@ class ComposeAction(str, Enum):
     pull_up = "pull_up"  # pull → up  (no prior down)
 
 
-@flow(name="docker-compose", log_prints=True)
-async def docker_compose(
+async def _run_action(
     compose_dir: str | Path,
     action: ComposeAction,
-    services: list[str] | None = None,
-    remove_volumes: bool = False,
+    services: list[str] | None,
+    remove_volumes: bool,
 ) -> bool:
-    """Generic Docker Compose maintenance flow.
-
-    Parameters
-    ----------
-    compose_dir:
-        Directory containing the compose file.
-    action:
-        What to do: up | down | restart | update | pull_up.
-    services:
-        Optional subset of services (used by up/restart/update/pull_up).
-    remove_volumes:
-        Remove named volumes on down (used by down/restart/update).
-    """
+    """Run the task sequence for *action*; stop at the first failing step."""
     logger = get_run_logger()
 
     match action:
@@ -75,5 +65,51 @@ async def docker_compose(
                 return False
             ok = await docker_compose_up(compose_dir, services=services)
 
-    logger.info("compose %s %s", action.value, "succeeded" if ok else "FAILED")
+    return ok
+
+
+@flow(name="docker-compose", log_prints=True)
+async def docker_compose(
+    compose_dir: str | Path,
+    action: ComposeAction,
+    services: list[str] | None = None,
+    remove_volumes: bool = False,
+) -> bool:
+    """Generic Docker Compose maintenance flow.
+
+    Parameters
+    ----------
+    compose_dir:
+        Directory containing the compose file.
+    action:
+        What to do: up | down | restart | update | pull_up.
+    services:
+        Optional subset of services (used by up/restart/update/pull_up).
+    remove_volumes:
+        Remove named volumes on down (used by down/restart/update).
+
+    The outcome and duration are recorded in the result history under
+    ``compose.<action>`` with the compose directory name as target.
+    """
+    logger = get_run_logger()
+    started = time.perf_counter()
+    ok = False
+    try:
+        ok = await _run_action(compose_dir, action, services, remove_volumes)
+    finally:
+        duration = time.perf_counter() - started
+        await record_results(
+            [
+                Sample(
+                    kind=f"compose.{action.value}",
+                    target=Path(compose_dir).name,
+                    ok=ok,
+                    value=duration,
+                )
+            ]
+        )
+
+    logger.info(
+        "compose %s %s after %.1fs", action.value, "succeeded" if ok else "FAILED", duration
+    )
     return ok
@@ -1,37 +1,95 @@
 """Example flow: check reachability of home-network devices."""
 
+import httpx
 from prefect import flow
 from prefect.logging import get_run_logger
 
-from home_prefect.tasks.network_tasks import http_check, ping_host
+from home_prefect.config import TargetGroup, get_settings
+from home_prefect.history import Sample
+from home_prefect.tasks.history_tasks import record_results
+from home_prefect.tasks.network_tasks import http_probe, ping_rtt
+
+
+def group_targets(hosts: list[str], endpoints: list[str]) -> list[TargetGroup]:
+    """Build ad-hoc target groups from plain host and URL lists.
+
+    Every host becomes a pinged group.  Endpoints are attached to the group of
+    their URL's host; endpoints on hosts that are not in *hosts* are grouped
+    per host without a ping, as before.
+    """
+    groups = {host: TargetGroup(name=host, host=host) for host in hosts}
+    for url in endpoints:
+        host = httpx.URL(url).host
+        if host not in groups:
+            groups[host] = TargetGroup(name=host, host=host, ping=False)
+        groups[host].endpoints.append(url)
+    return list(groups.values())
 
 
 @flow(name="network-health-check", log_prints=True)
 async def network_health_check(
     hosts: list[str] | None = None,
     endpoints: list[str] | None = None,
+    groups: list[str] | None = None,
 ) -> dict[str, bool]:
-    """Ping a list of hosts and perform HTTP checks on a list of URLs.
+    """Ping hosts and perform HTTP checks on their endpoints, one host at a time.
 
     Args:
         hosts:     IP addresses or hostnames to ping (e.g. router, NAS, …).
         endpoints: HTTP(S) URLs to probe (e.g. internal services).
+        groups:    Names of ``Settings.target_groups`` to check.  Only valid
+                   when neither *hosts* nor *endpoints* is given; ``None``
+                   checks all configured groups.
+
+    Each host is pinged at most once per run, even if several groups share it.
+    Endpoints of a host that failed its ping are reported unreachable without
+    an HTTP request.  Every probe (ping RTT and HTTP response time in ms) is
+    recorded in the result history in one batch at the end of the run.
 
     Returns:
         A dict mapping each target to a boolean indicating reachability.
     """
     logger = get_run_logger()
-    hosts = hosts or ["192.168.1.1"]
-    endpoints = endpoints or []
+    if hosts is None and endpoints is None:
+        targets = get_settings().target_groups
+        if groups is not None:
+            unknown = set(groups) - {g.name for g in targets}
+            if unknown:
+                raise ValueError(f"Unknown target groups: {', '.join(sorted(unknown))}")
+            targets = [g for g in targets if g.name in groups]
+    elif groups is not None:
+        raise ValueError("groups cannot be combined with explicit hosts or endpoints")
+    else:
+        targets = group_targets(hosts or [], endpoints or [])
 
     results: dict[str, bool] = {}
+    samples: list[Sample] = []
 
-    for host in hosts:
-        results[host] = await ping_host(host)
+    try:
+        for group in targets:
+            if group.ping and group.host not in results:
+                results[group.host], rtt = await ping_rtt(group.host)
+                samples.append(
+                    Sample(kind="ping", target=group.host, ok=results[group.host], value=rtt)
+                )
+            # Unpinged hosts are assumed up unless another group found them down.
+            host_up = results.get(group.host, True)
 
-    for url in endpoints:
-        status = await http_check(url)
-        results[url] = 200 <= status < 400
+            for url in group.endpoints:
+                if not host_up:
+                    logger.warning("%s: host %s is down – skipping %s", group.name, group.host, url)
+                    results[url] = False
+                    samples.append(Sample(kind="http", target=url, ok=False))
+                    continue
+                try:
+                    status, elapsed_ms = await http_probe(url)
+                except Exception:
+                    samples.append(Sample(kind="http", target=url, ok=False))
+                    raise
+                results[url] = 200 <= status < 400
+                samples.append(Sample(kind="http", target=url, ok=results[url], value=elapsed_ms))
+    finally:
+        await record_results(samples)
 
     healthy = sum(v for v in results.values())
     logger.info("Health check done: %d/%d targets reachable", healthy, len(results))
@@ -0,0 +1,5 @@
+"""Local time-series history of health-check and compose results."""
+
+from home_prefect.history.store import ResultStore, Sample, Summary
+
+__all__ = ["ResultStore", "Sample", "Summary"]
@@ -0,0 +1,64 @@
+"""Query the result history from the command line.
+
+Usage::
+
+    python -m home_prefect.history targets
+    python -m home_prefect.history summary ping nas.local --days 30
+    python -m home_prefect.history series compose.update immich --resolution day --days 14
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from home_prefect.config import get_settings
+from home_prefect.history.store import DAY, RESOLUTIONS, ResultStore, Summary
+
+
+def _fmt(value: float | None, spec: str = ".2f") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def _row(label: str, s: Summary) -> str:
+    return (
+        f"{label:<19}  n={s.count:<6} avail={_fmt(s.availability, '.2%'):>8}  "
+        f"mean={_fmt(s.mean):>9}  p95={_fmt(s.p95):>9}  "
+        f"min={_fmt(s.min):>9}  max={_fmt(s.max):>9}"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m home_prefect.history")
+    parser.add_argument("--db", default=None, help="Database path (default: HISTORY_DB).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("targets", help="List recorded kind/target pairs.")
+    for name, help_text in (
+        ("summary", "Availability and value statistics over a time range."),
+        ("series", "Per-bucket statistics over a time range."),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("kind", help='e.g. "ping", "http", "compose.update"')
+        cmd.add_argument("target", help="Host, URL or compose stack name.")
+        cmd.add_argument("--days", type=float, default=1.0, help="Look-back window (default: 1).")
+        if name == "series":
+            cmd.add_argument("--resolution", choices=RESOLUTIONS, default="hour")
+
+    args = parser.parse_args(argv)
+    with ResultStore(args.db or get_settings().history_db) as store:
+        if args.command == "targets":
+            for kind, target in store.targets():
+                print(f"{kind:<16} {target}")
+            return
+
+        since = time.time() - args.days * DAY
+        if args.command == "summary":
+            print(_row(f"last {args.days:g}d", store.summary(args.kind, args.target, since)))
+        else:
+            resolution = RESOLUTIONS[args.resolution]
+            for s in store.series(args.kind, args.target, resolution, since):
+                print(_row(datetime.fromtimestamp(s.start).strftime("%Y-%m-%d %H:%M"), s))
+
+
+if __name__ == "__main__":
+    main()
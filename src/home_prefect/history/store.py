@@ -0,0 +1,333 @@
+"""SQLite time-series store for health-check and compose results.
+
+Every batched write appends the raw samples and folds them into minute, hour
+and day rollups in the same transaction.  Each resolution has its own
+retention window and is pruned on write, so the database stays bounded.
+Summaries over windows still covered by the raw samples are computed from
+them exactly; longer windows only scan pre-aggregated rows.
+
+Percentiles are estimated from a per-rollup histogram with logarithmic bins
+(about 5 % wide), which merges exactly across buckets.
+"""
+
+import json
+import math
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+RAW = 0
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+RESOLUTIONS = {"minute": MINUTE, "hour": HOUR, "day": DAY}
+
+# Seconds each resolution is kept; RAW refers to the individual samples.
+DEFAULT_RETENTION: dict[int, float] = {
+    RAW: 2 * DAY,
+    MINUTE: 14 * DAY,
+    HOUR: 180 * DAY,
+    DAY: 5 * 365 * DAY,
+}
+
+_HIST_BASE = 1.05
+_HIST_FLOOR = 1e-6  # values at or below this share the lowest bin
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts     REAL    NOT NULL,
+    kind   TEXT    NOT NULL,
+    target TEXT    NOT NULL,
+    ok     INTEGER NOT NULL,
+    value  REAL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE INDEX IF NOT EXISTS samples_key ON samples (kind, target, ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution  INTEGER NOT NULL,
+    kind        TEXT    NOT NULL,
+    target      TEXT    NOT NULL,
+    bucket      INTEGER NOT NULL,
+    count       INTEGER NOT NULL,
+    ok_count    INTEGER NOT NULL,
+    value_count INTEGER NOT NULL,
+    value_sum   REAL    NOT NULL,
+    value_min   REAL,
+    value_max   REAL,
+    hist        TEXT    NOT NULL,
+    PRIMARY KEY (resolution, kind, target, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_bucket ON rollups (resolution, bucket);
+"""
+
+
+class Sample(BaseModel):
+    """A single probe or compose-action outcome."""
+
+    kind: str = Field(description='What was measured, e.g. "ping", "http", "compose.update".')
+    target: str = Field(description="Host, URL or compose stack the sample belongs to.")
+    ok: bool = Field(description="Whether the probe or action succeeded.")
+    value: float | None = Field(
+        default=None, description="Measured value: RTT / response time in ms, duration in s."
+    )
+    ts: float = Field(default_factory=time.time, description="Unix timestamp of the sample.")
+
+
+class Summary(BaseModel):
+    """Aggregated samples of one kind/target over a time range."""
+
+    start: float
+    count: int
+    ok_count: int
+    availability: float | None
+    mean: float | None
+    p95: float | None
+    min: float | None
+    max: float | None
+
+
+def _hist_bin(value: float) -> int:
+    return math.floor(math.log(max(value, _HIST_FLOOR), _HIST_BASE))
+
+
+class _Rollup:
+    """Mergeable aggregate of samples; mirrors one row of the ``rollups`` table."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.ok_count = 0
+        self.value_count = 0
+        self.value_sum = 0.0
+        self.value_min: float | None = None
+        self.value_max: float | None = None
+        self.hist: dict[int, int] = {}
+
+    def add(self, ok: bool, value: float | None) -> None:
+        self.count += 1
+        self.ok_count += ok
+        if value is None:
+            return
+        self.value_count += 1
+        self.value_sum += value
+        self.value_min = value if self.value_min is None else min(self.value_min, value)
+        self.value_max = value if self.value_max is None else max(self.value_max, value)
+        b = _hist_bin(value)
+        self.hist[b] = self.hist.get(b, 0) + 1
+
+    def merge_row(self, row: tuple[Any, ...]) -> None:
+        count, ok_count, value_count, value_sum, value_min, value_max, hist = row
+        self.count += count
+        self.ok_count += ok_count
+        self.value_count += value_count
+        self.value_sum += value_sum
+        if value_min is not None:
+            self.value_min = value_min if self.value_min is None else min(self.value_min, value_min)
+        if value_max is not None:
+            self.value_max = value_max if self.value_max is None else max(self.value_max, value_max)
+        for b, n in json.loads(hist).items():
+            self.hist[int(b)] = self.hist.get(int(b), 0) + n
+
+    def row(self) -> tuple[Any, ...]:
+        return (
+            self.count,
+            self.ok_count,
+            self.value_count,
+            self.value_sum,
+            self.value_min,
+            self.value_max,
+            json.dumps(self.hist, separators=(",", ":")),
+        )
+
+    def percentile(self, q: float) -> float | None:
+        if not self.value_count:
+            return None
+        rank = max(1, math.ceil(q * self.value_count))
+        seen = 0
+        for b in sorted(self.hist):
+            seen += self.hist[b]
+            if seen >= rank:
+                # Upper bin edge, clamped to the observed range.
+                estimate = _HIST_BASE ** (b + 1)
+                if self.value_min is not None:
+                    estimate = max(estimate, self.value_min)
+                if self.value_max is not None:
+                    estimate = min(estimate, self.value_max)
+                return estimate
+        return self.value_max
+
+    def summary(self, start: float) -> Summary:
+        return Summary(
+            start=start,
+            count=self.count,
+            ok_count=self.ok_count,
+            availability=self.ok_count / self.count if self.count else None,
+            mean=self.value_sum / self.value_count if self.value_count else None,
+            p95=self.percentile(0.95),
+            min=self.value_min,
+            max=self.value_max,
+        )
+
+
+_ROLLUP_COLUMNS = "count, ok_count, value_count, value_sum, value_min, value_max, hist"
+
+
+class ResultStore:
+    """Append-only result history backed by a single SQLite file.
+
+    Use as a context manager, one instance per thread::
+
+        with ResultStore(path) as store:
+            store.write(samples)
+            store.summary("ping", "nas.local", since=time.time() - 30 * DAY)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        retention: dict[int, float] | None = None,
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self._conn = sqlite3.connect(self.path)
+        # WAL lets the CLI read while a flow run is writing.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+
+    def write(self, samples: Iterable[Sample], now: float | None = None) -> int:
+        """Store *samples* and update their rollups in one transaction.
+
+        Returns the number of samples written.
+        """
+        samples = list(samples)
+        if not samples:
+            return 0
+
+        pending: dict[tuple[int, str, str, int], _Rollup] = {}
+        for sample in samples:
+            for resolution in RESOLUTIONS.values():
+                bucket = int(sample.ts // resolution) * resolution
+                key = (resolution, sample.kind, sample.target, bucket)
+                pending.setdefault(key, _Rollup()).add(sample.ok, sample.value)
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO samples (ts, kind, target, ok, value) VALUES (?, ?, ?, ?, ?)",
+                [(s.ts, s.kind, s.target, s.ok, s.value) for s in samples],
+            )
+            for key, rollup in pending.items():
+                existing = self._conn.execute(
+                    f"SELECT {_ROLLUP_COLUMNS} FROM rollups "
+                    "WHERE resolution = ? AND kind = ? AND target = ? AND bucket = ?",
+                    key,
+                ).fetchone()
+                if existing is not None:
+                    rollup.merge_row(existing)
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO rollups (resolution, kind, target, bucket, "
+                    f"{_ROLLUP_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, *rollup.row()),
+                )
+            self._prune(time.time() if now is None else now)
+        return len(samples)
+
+    def _prune(self, now: float) -> None:
+        for resolution, keep in self.retention.items():
+            cutoff = now - keep
+            if resolution == RAW:
+                self._conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+            else:
+                self._conn.execute(
+                    "DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                    (resolution, cutoff - resolution),
+                )
+
+    # ── Querying ─────────────────────────────────────────────────────────────
+
+    def _resolution_for(self, since: float, now: float) -> int:
+        """Finest resolution (RAW first) whose retention still covers *since*."""
+        for resolution in (RAW, *sorted(RESOLUTIONS.values())):
+            if since >= now - self.retention[resolution]:
+                return resolution
+        return DAY
+
+    def _rollups(
+        self, kind: str, target: str, resolution: int, since: float, until: float
+    ) -> list[tuple[Any, ...]]:
+        return self._conn.execute(
+            f"SELECT bucket, {_ROLLUP_COLUMNS} FROM rollups "
+            "WHERE resolution = ? AND kind = ? AND target = ? AND bucket >= ? AND bucket < ? "
+            "ORDER BY bucket",
+            (resolution, kind, target, int(since // resolution) * resolution, until),
+        ).fetchall()
+
+    def summary(self, kind: str, target: str, since: float, until: float | None = None) -> Summary:
+        """Availability and value statistics for *kind*/*target* since *since*.
+
+        Ranges still covered by the raw samples are exact.  Older ranges use
+        the finest rollup still retained, so bucket edges may widen them by up
+        to one bucket at the start.
+        """
+        now = time.time()
+        until = now if until is None else until
+        resolution = self._resolution_for(since, now)
+        total = _Rollup()
+        if resolution == RAW:
+            for ok, value in self._conn.execute(
+                "SELECT ok, value FROM samples "
+                "WHERE kind = ? AND target = ? AND ts >= ? AND ts < ?",
+                (kind, target, since, until),
+            ):
+                total.add(bool(ok), value)
+        else:
+            for row in self._rollups(kind, target, resolution, since, until):
+                total.merge_row(row[1:])
+        return total.summary(since)
+
+    def series(
+        self,
+        kind: str,
+        target: str,
+        resolution: int,
+        since: float,
+        until: float | None = None,
+    ) -> list[Summary]:
+        """One :class:`Summary` per non-empty bucket of *resolution* seconds."""
+        until = time.time() if until is None else until
+        summaries = []
+        for bucket, *row in self._rollups(kind, target, resolution, since, until):
+            rollup = _Rollup()
+            rollup.merge_row(tuple(row))
+            summaries.append(rollup.summary(bucket))
+        return summaries
+
+    def targets(self) -> list[tuple[str, str]]:
+        """All ``(kind, target)`` pairs with day rollups, sorted."""
+        return self._conn.execute(
+            "SELECT DISTINCT kind, target FROM rollups WHERE resolution = ? ORDER BY kind, target",
+            (DAY,),
+        ).fetchall()
@@ -0,0 +1,35 @@
+"""Prefect tasks that persist results to the local history store."""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from prefect import get_run_logger, task
+
+from home_prefect.config import get_settings
+from home_prefect.history import ResultStore, Sample
+
+
+def _write(path: Path, samples: list[Sample]) -> int:
+    with ResultStore(path) as store:
+        return store.write(samples)
+
+
+@task(name="record-results")
+async def record_results(samples: list[Sample]) -> None:
+    """Append *samples* to the history store in a single transaction.
+
+    Does nothing when ``Settings.history_enabled`` is off.  Storage errors are
+    logged, never raised, so history problems cannot fail the calling flow.
+    """
+    settings = get_settings()
+    if not settings.history_enabled or not samples:
+        return
+
+    logger = get_run_logger()
+    try:
+        written = await asyncio.to_thread(_write, settings.history_db, samples)
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Could not record %d result(s): %s", len(samples), exc)
+        return
+    logger.info("Recorded %d result(s) in %s", written, settings.history_db)
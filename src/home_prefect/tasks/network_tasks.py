@@ -1,38 +1,215 @@
 """Network-related Prefect tasks (ping, HTTP checks, etc.)."""
 
 import asyncio
+import ipaddress
+import re
+import socket
+import time
+from collections.abc import Iterable
+from typing import Any
 
+import httpcore
 import httpx
 from prefect import get_run_logger, task
 
+from home_prefect.config import get_settings
+
+# iputils: "rtt min/avg/max/mdev = 0.1/0.2/0.3/0.0 ms", busybox: "round-trip min/avg/max = …"
+_RTT_RE = re.compile(r"min/avg/max\S* = [\d.]+/([\d.]+)/")
+
+# hostname → (addresses in getaddrinfo order, expiry as time.monotonic())
+_resolve_cache: dict[str, tuple[list[str], float]] = {}
+
+
+def _format_address(sockaddr: tuple[Any, ...]) -> str:
+    """Render a getaddrinfo sockaddr, keeping the IPv6 scope id (``fe80::1%2``)."""
+    address = str(sockaddr[0])
+    if len(sockaddr) == 4 and sockaddr[3]:
+        address = f"{address}%{sockaddr[3]}"
+    return address
+
+
+async def resolve_addresses(host: str, ttl: float | None = None) -> list[str]:
+    """Return all IP addresses of *host*, reusing cached lookups for *ttl* seconds.
+
+    The network tasks resolve through this cache so that retries and repeated
+    checks of the same host do not look it up again.  IP literals are returned
+    unchanged.  *ttl* defaults to ``Settings.dns_cache_ttl``.  Raises
+    :class:`socket.gaierror` if the name cannot be resolved; failures are not
+    cached.
+    """
+    try:
+        return [str(ipaddress.ip_address(host))]
+    except ValueError:
+        pass
+
+    now = time.monotonic()
+    cached = _resolve_cache.get(host)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    addresses = list(dict.fromkeys(_format_address(info[4]) for info in infos))
+    if ttl is None:
+        ttl = get_settings().dns_cache_ttl
+    _resolve_cache[host] = (addresses, now + ttl)
+    return addresses
 
-@task(name="ping-host", retries=2, retry_delay_seconds=5)
-async def ping_host(host: str, count: int = 3) -> bool:
-    """Return True if *host* is reachable via ICMP ping.
 
-    Uses the OS `ping` command so no root privileges are required.
+async def resolve_host(host: str, ttl: float | None = None) -> str:
+    """Return the first address :func:`resolve_addresses` finds for *host*."""
+    return (await resolve_addresses(host, ttl))[0]
+
+
+class _CachedResolverBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that connects to addresses from :func:`resolve_addresses`.
+
+    Addresses are tried one after another until one connects, each with the
+    full connect timeout (httpcore's default backend races them instead).
+    Only the TCP connect target changes; the ``Host`` header, TLS SNI and
+    certificate checks still use the hostname from the URL.
     """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend) -> None:
+        self._backend = backend
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await resolve_addresses(host)
+        except socket.gaierror as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+
+        errors: list[Exception] = []
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                errors.append(exc)
+        raise errors[-1]
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _CachedResolverTransport(httpx.AsyncHTTPTransport):
+    """``httpx`` transport whose connections use the shared resolver cache."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        # httpx has no public hook for name resolution, so wrap httpcore's backend.
+        # Assigning to a missing attribute would silently disable the cache.
+        pool = getattr(self, "_pool", None)
+        if not hasattr(pool, "_network_backend"):
+            raise RuntimeError("httpx/httpcore internals changed: cannot install resolver cache")
+        pool._network_backend = _CachedResolverBackend(pool._network_backend)
+
+
+async def _ping(host: str, count: int) -> tuple[bool, float | None]:
+    """Ping *host*; return ``(reachable, average RTT in ms)``."""
     logger = get_run_logger()
-    cmd = ["ping", "-c", str(count), "-W", "2", host]
+    try:
+        address = await resolve_host(host)
+    except socket.gaierror as exc:
+        logger.info("ping %s → UNRESOLVABLE (%s)", host, exc)
+        return False, None
+
+    cmd = ["ping", "-c", str(count), "-W", "2", address]
     proc = await asyncio.create_subprocess_exec(
         *cmd,
-        stdout=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.DEVNULL,
     )
-    returncode = await proc.wait()
-    reachable = returncode == 0
-    logger.info("ping %s → %s", host, "OK" if reachable else "UNREACHABLE")
+    stdout, _ = await proc.communicate()
+    reachable = proc.returncode == 0
+    match = _RTT_RE.search(stdout.decode(errors="replace")) if reachable else None
+    rtt = float(match.group(1)) if match else None
+    if rtt is None:
+        logger.info("ping %s → %s", host, "OK" if reachable else "UNREACHABLE")
+    else:
+        logger.info("ping %s → OK (%.2f ms)", host, rtt)
+    return reachable, rtt
+
+
+@task(name="ping-host", retries=2, retry_delay_seconds=5)
+async def ping_host(host: str, count: int = 3) -> bool:
+    """Return True if *host* is reachable via ICMP ping.
+
+    Uses the OS `ping` command so no root privileges are required.  The
+    hostname is resolved through :func:`resolve_host`.
+    """
+    reachable, _ = await _ping(host, count)
     return reachable
 
 
+@task(name="ping-rtt", retries=2, retry_delay_seconds=5)
+async def ping_rtt(host: str, count: int = 3) -> tuple[bool, float | None]:
+    """Return ``(reachable, average RTT in ms)`` for *host*.
+
+    Same probe as :func:`ping_host`, for callers that also want the latency.
+    Reachability comes from the exit code; the RTT is None when the host is
+    down or the ``ping`` output has no summary line this module can parse.
+    """
+    return await _ping(host, count)
+
+
+async def _http_get(url: str, timeout: float) -> tuple[int, float]:
+    """GET *url*; return ``(status code, response time in ms)``.
+
+    The time covers the request and any redirects, but not Prefect retries.
+    """
+    logger = get_run_logger()
+    async with httpx.AsyncClient(
+        timeout=timeout,
+        follow_redirects=True,
+        transport=_CachedResolverTransport(),
+    ) as client:
+        started = time.perf_counter()
+        response = await client.get(url)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("GET %s → %d (%.0f ms)", url, response.status_code, elapsed_ms)
+    return response.status_code, elapsed_ms
+
+
 @task(name="http-check", retries=2, retry_delay_seconds=10)
 async def http_check(url: str, timeout: float = 10.0) -> int:
     """Return the HTTP status code for *url*.
 
+    Hostnames are resolved through :func:`resolve_addresses`.
+
     Raises on network errors so Prefect can retry.
     """
-    logger = get_run_logger()
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        response = await client.get(url)
-    logger.info("GET %s → %d", url, response.status_code)
-    return response.status_code
+    status, _ = await _http_get(url, timeout)
+    return status
+
+
+@task(name="http-probe", retries=2, retry_delay_seconds=10)
+async def http_probe(url: str, timeout: float = 10.0) -> tuple[int, float]:
+    """Return ``(status code, response time in ms)`` for *url*.
+
+    Same request as :func:`http_check`, for callers that also want the
+    latency.  Raises on network errors so Prefect can retry.
+    """
+    return await _http_get(url, timeout)
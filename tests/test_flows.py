@@ -1,24 +1,38 @@
 """Tests for home_prefect flows."""
 
-from unittest.mock import AsyncMock, patch
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from home_prefect.config import Settings, TargetGroup
+from home_prefect.flows.docker_compose_flows import ComposeAction, docker_compose
 from home_prefect.flows.network_health_flows import network_health_check
 
 
+@pytest.fixture(autouse=True)
+def record_results() -> Iterator[AsyncMock]:
+    """Run flow bodies without a Prefect run context or history writes."""
+    recorder = AsyncMock()
+    with (
+        patch("home_prefect.flows.network_health_flows.get_run_logger", MagicMock()),
+        patch("home_prefect.flows.network_health_flows.record_results", recorder),
+    ):
+        yield recorder
+
+
 @pytest.mark.asyncio
 async def test_network_health_check_all_reachable() -> None:
     with (
         patch(
-            "home_prefect.flows.network_health.ping_host",
+            "home_prefect.flows.network_health_flows.ping_rtt",
             new_callable=AsyncMock,
-            return_value=True,
+            return_value=(True, 1.5),
         ),
         patch(
-            "home_prefect.flows.network_health.http_check",
+            "home_prefect.flows.network_health_flows.http_probe",
             new_callable=AsyncMock,
-            return_value=200,
+            return_value=(200, 12.0),
         ),
     ):
         result = await network_health_check.fn(
@@ -32,10 +46,164 @@ async def test_network_health_check_all_reachable() -> None:
 @pytest.mark.asyncio
 async def test_network_health_check_host_down() -> None:
     with patch(
-        "home_prefect.flows.network_health.ping_host",
+        "home_prefect.flows.network_health_flows.ping_rtt",
         new_callable=AsyncMock,
-        return_value=False,
+        return_value=(False, None),
     ):
         result = await network_health_check.fn(hosts=["10.0.0.99"], endpoints=[])
 
     assert result == {"10.0.0.99": False}
+
+
+@pytest.mark.asyncio
+async def test_network_health_check_skips_endpoints_of_down_host() -> None:
+    http = AsyncMock(return_value=(200, 12.0))
+    with (
+        patch(
+            "home_prefect.flows.network_health_flows.ping_rtt",
+            new_callable=AsyncMock,
+            return_value=(False, None),
+        ),
+        patch("home_prefect.flows.network_health_flows.http_probe", http),
+    ):
+        result = await network_health_check.fn(
+            hosts=["nas.local"],
+            endpoints=["http://nas.local:5000", "http://nas.local/dav"],
+        )
+
+    assert result == {
+        "nas.local": False,
+        "http://nas.local:5000": False,
+        "http://nas.local/dav": False,
+    }
+    http.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_network_health_check_pings_shared_host_once() -> None:
+    settings = Settings(
+        target_groups=[
+            TargetGroup(name="nas-web", host="nas.local", endpoints=["http://nas.local"]),
+            TargetGroup(name="nas-dav", host="nas.local", endpoints=["http://nas.local/dav"]),
+            TargetGroup(name="router", host="192.168.1.1"),
+        ]
+    )
+    ping = AsyncMock(return_value=(False, None))
+    with (
+        patch("home_prefect.flows.network_health_flows.get_settings", return_value=settings),
+        patch("home_prefect.flows.network_health_flows.ping_rtt", ping),
+    ):
+        result = await network_health_check.fn(groups=["nas-web", "nas-dav"])
+
+    ping.assert_awaited_once_with("nas.local")
+    assert result == {"nas.local": False, "http://nas.local": False, "http://nas.local/dav": False}
+
+
+@pytest.mark.asyncio
+async def test_network_health_check_rejects_groups_with_explicit_targets() -> None:
+    with pytest.raises(ValueError, match="cannot be combined"):
+        await network_health_check.fn(hosts=["nas.local"], groups=["nas"])
+
+
+@pytest.mark.asyncio
+async def test_network_health_check_rejects_unknown_groups() -> None:
+    settings = Settings(target_groups=[TargetGroup(name="router", host="192.168.1.1")])
+    with (
+        patch("home_prefect.flows.network_health_flows.get_settings", return_value=settings),
+        pytest.raises(ValueError, match="Unknown target groups: nas"),
+    ):
+        await network_health_check.fn(groups=["nas"])
+
+
+@pytest.mark.asyncio
+async def test_network_health_check_records_every_probe(record_results: AsyncMock) -> None:
+    with (
+        patch(
+            "home_prefect.flows.network_health_flows.ping_rtt",
+            new_callable=AsyncMock,
+            return_value=(True, 2.0),
+        ),
+        patch(
+            "home_prefect.flows.network_health_flows.http_probe",
+            new_callable=AsyncMock,
+            return_value=(503, 40.0),
+        ),
+    ):
+        await network_health_check.fn(hosts=["nas.local"], endpoints=["http://nas.local"])
+
+    (samples,) = record_results.await_args.args
+    assert [(s.kind, s.target, s.ok) for s in samples] == [
+        ("ping", "nas.local", True),
+        ("http", "http://nas.local", False),
+    ]
+    assert [s.value for s in samples] == [2.0, 40.0]
+
+
+@pytest.mark.asyncio
+async def test_network_health_check_host_up_without_rtt(record_results: AsyncMock) -> None:
+    http = AsyncMock(return_value=(200, 12.0))
+    with (
+        patch(
+            "home_prefect.flows.network_health_flows.ping_rtt",
+            new_callable=AsyncMock,
+            return_value=(True, None),
+        ),
+        patch("home_prefect.flows.network_health_flows.http_probe", http),
+    ):
+        result = await network_health_check.fn(hosts=["nas.local"], endpoints=["http://nas.local"])
+
+    assert result == {"nas.local": True, "http://nas.local": True}
+    http.assert_awaited_once_with("http://nas.local")
+    (samples,) = record_results.await_args.args
+    assert (samples[0].ok, samples[0].value) == (True, None)
+
+
+@pytest.fixture
+def compose_recorder() -> Iterator[AsyncMock]:
+    recorder = AsyncMock()
+    with (
+        patch("home_prefect.flows.docker_compose_flows.get_run_logger", MagicMock()),
+        patch("home_prefect.flows.docker_compose_flows.record_results", recorder),
+    ):
+        yield recorder
+
+
+@pytest.mark.asyncio
+async def test_docker_compose_records_action_and_duration(compose_recorder: AsyncMock) -> None:
+    with (
+        patch(
+            "home_prefect.flows.docker_compose_flows.docker_compose_pull",
+            new_callable=AsyncMock,
+            return_value=True,
+        ),
+        patch(
+            "home_prefect.flows.docker_compose_flows.docker_compose_up",
+            new_callable=AsyncMock,
+            return_value=True,
+        ),
+    ):
+        ok = await docker_compose.fn("/srv/docker/immich", ComposeAction.pull_up)
+
+    assert ok is True
+    ((sample,),) = compose_recorder.await_args.args
+    assert (sample.kind, sample.target, sample.ok) == ("compose.pull_up", "immich", True)
+    assert sample.value is not None and sample.value >= 0
+
+
+@pytest.mark.asyncio
+async def test_docker_compose_records_failure_when_action_raises(
+    compose_recorder: AsyncMock,
+) -> None:
+    with (
+        patch(
+            "home_prefect.flows.docker_compose_flows.docker_compose_up",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("docker daemon gone"),
+        ),
+        pytest.raises(RuntimeError, match="docker daemon gone"),
+    ):
+        await docker_compose.fn("/srv/docker/immich", ComposeAction.up)
+
+    ((sample,),) = compose_recorder.await_args.args
+    assert (sample.kind, sample.target, sample.ok) == ("compose.up", "immich", False)
+    assert sample.value is not None
@@ -0,0 +1,190 @@
+"""Tests for the palantiri camera bridge (runs without camera hardware)."""
+
+import asyncio
+import importlib
+import itertools
+import random
+import sys
+from collections.abc import Iterator
+from types import ModuleType
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+# Camera, encoder and uploader libraries are only installed on the Pi.
+PI_ONLY_MODULES = (
+    "picamera2",
+    "cv2",
+    "boto3",
+    "botocore",
+    "botocore.client",
+    "botocore.exceptions",
+    "requests",
+    "aiohttp",
+)
+
+
+@pytest.fixture(scope="module")
+def palantiri() -> Iterator[ModuleType]:
+    """Import palantiri with missing Pi-only libraries stubbed for this module only."""
+    with pytest.MonkeyPatch.context() as mp:
+        for name in PI_ONLY_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                mp.setitem(sys.modules, name, MagicMock())
+        try:
+            yield importlib.import_module("palantiri")
+        finally:
+            sys.modules.pop("palantiri", None)
+
+
+@pytest.fixture
+def FrameRing(palantiri: ModuleType) -> Any:  # noqa: N802
+    return palantiri.FrameRing
+
+
+def frame(n: int, size: int) -> bytes:
+    return bytes([n % 256]) * size
+
+
+def live_regions(ring: Any) -> list[tuple[int, int]]:
+    slots = [(ring._oldest + i) % len(ring._offsets) for i in range(ring._count)]
+    return [(ring._offsets[s], ring._offsets[s] + ring._lengths[s]) for s in slots]
+
+
+def test_push_rejects_frame_larger_than_budget(FrameRing: Any) -> None:
+    ring = FrameRing(seconds=10, max_bytes=100, max_frames=4)
+    assert ring.push(0.0, frame(0, 101)) is False
+    assert ring.snapshot(0, 10) == []
+
+
+def test_byte_budget_evicts_oldest_and_wraps(FrameRing: Any) -> None:
+    ring = FrameRing(seconds=100, max_bytes=1000, max_frames=100)
+    for i in range(10):
+        assert ring.push(float(i), frame(i, 300))
+
+    assert ring.snapshot(0, 100) == [(float(i), frame(i, 300)) for i in (7, 8, 9)]
+
+
+def test_wrap_evicts_unused_tail_first(FrameRing: Any) -> None:
+    ring = FrameRing(seconds=100, max_bytes=1000, max_frames=100)
+    ring.push(0.0, frame(0, 400))
+    ring.push(1.0, frame(1, 400))
+    # Does not fit in the 200 bytes left at the end: written at offset 0,
+    # which overwrites frame 0 but leaves frame 1 intact.
+    ring.push(2.0, frame(2, 400))
+
+    assert ring.snapshot(0, 100) == [(1.0, frame(1, 400)), (2.0, frame(2, 400))]
+    assert live_regions(ring) == [(400, 800), (0, 400)]
+
+
+def test_age_eviction(FrameRing: Any) -> None:
+    ring = FrameRing(seconds=5, max_bytes=1000, max_frames=100)
+    for i in range(10):
+        ring.push(float(i), frame(i, 10))
+
+    assert [ts for ts, _ in ring.snapshot(-1, 100)] == [4.0, 5.0, 6.0, 7.0, 8.0, 9.0]
+
+
+def test_slot_count_eviction(FrameRing: Any) -> None:
+    ring = FrameRing(seconds=100, max_bytes=10_000, max_frames=3)
+    for i in range(5):
+        ring.push(float(i), frame(i, 10))
+
+    assert [ts for ts, _ in ring.snapshot(-1, 100)] == [2.0, 3.0, 4.0]
+
+
+def test_snapshot_filters_by_time_and_copies(FrameRing: Any) -> None:
+    ring = FrameRing(seconds=100, max_bytes=1000, max_frames=10)
+    for i in range(5):
+        ring.push(float(i), frame(i, 10))
+
+    frames = ring.snapshot(1.0, 3.0)
+    assert [ts for ts, _ in frames] == [1.0, 2.0, 3.0]
+
+    for i in range(5, 200):
+        ring.push(float(i), frame(i, 10))
+    assert frames[0][1] == frame(1, 10)
+
+
+def test_randomized_invariants(FrameRing: Any) -> None:
+    rng = random.Random(1234)
+    ring = FrameRing(seconds=20, max_bytes=2000, max_frames=16)
+    for i in range(2000):
+        size = rng.randint(1, 700)
+        ts = i * 0.5
+        ring.push(ts, frame(i, size))
+
+        frames = ring.snapshot(-1, ts)
+        assert frames[-1] == (ts, frame(i, size))
+        stamps = [t for t, _ in frames]
+        assert stamps == sorted(stamps)
+        assert all(t >= ts - 20 for t in stamps)
+        assert all(data == frame(int(t * 2), len(data)) for t, data in frames)
+
+        regions = sorted(live_regions(ring))
+        assert all(a_end <= b_start for (_, a_end), (b_start, _) in itertools.pairwise(regions))
+        assert sum(end - start for start, end in regions) <= 2000
+
+
+@pytest.mark.parametrize(
+    ("body", "error"),
+    [
+        ('{"pre": 5', "body must be valid JSON"),
+        ("[]", "body must be a JSON object"),
+        ("5", "body must be a JSON object"),
+        ('{"pre": "soon"}', "pre and post must be numbers"),
+        ('{"pre": NaN}', "pre and post must be finite"),
+        ('{"post": Infinity}', "pre and post must be finite"),
+    ],
+)
+async def test_clip_rejects_invalid_body(palantiri: ModuleType, body: str, error: str) -> None:
+    web = pytest.importorskip("aiohttp.web")
+    from aiohttp.test_utils import TestClient, TestServer
+
+    # Routes only: make_app() would also start the camera thread.
+    app = web.Application()
+    app.add_routes(palantiri.routes)
+    async with TestClient(TestServer(app)) as client:
+        resp = await client.post("/clip", data=body, headers={"Content-Type": "application/json"})
+        assert resp.status == 400
+        assert (await resp.json())["error"] == error
+
+
+async def test_stream_serves_frames_and_ends_on_stall(
+    palantiri: ModuleType, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    web = pytest.importorskip("aiohttp.web")
+    from aiohttp.test_utils import TestClient, TestServer
+
+    monkeypatch.setattr(palantiri, "STREAM_STALL_TIMEOUT", 0.2)
+    monkeypatch.setattr(palantiri, "_frame_ready", asyncio.Event())
+    app = web.Application()
+    app.add_routes(palantiri.routes)
+    async with TestClient(TestServer(app)) as client:
+        resp = await client.get("/stream")
+        asyncio.get_running_loop().call_later(0.05, palantiri._publish_frame, b"jpeg")
+        body = await asyncio.wait_for(resp.read(), timeout=2)
+
+    assert b"Content-Length: 4\r\n\r\njpeg\r\n" in body
+    assert palantiri._viewers == 0
+
+
+async def test_shutdown_closes_open_streams(
+    palantiri: ModuleType, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    web = pytest.importorskip("aiohttp.web")
+    from aiohttp.test_utils import TestClient, TestServer
+
+    monkeypatch.setattr(palantiri, "_stopping", False)
+    monkeypatch.setattr(palantiri, "_frame_ready", asyncio.Event())
+    app = web.Application()
+    app.add_routes(palantiri.routes)
+    async with TestClient(TestServer(app)) as client:
+        resp = await client.get("/stream")
+        await palantiri._close_streams(app)
+        body = await asyncio.wait_for(resp.read(), timeout=1)
+
+    assert body == b""
@@ -1,14 +1,16 @@
 """Tests for the Settings model."""
 
 import pytest
+from pydantic import ValidationError
 
-from home_prefect.config.settings import Settings
+from home_prefect.config.settings import Settings, TargetGroup
 
 
 def test_settings_defaults() -> None:
     s = Settings()
     assert s.prefect_api_url == "http://localhost:4200/api"
     assert s.log_level == "INFO"
+    assert s.target_groups == [TargetGroup(name="router", host="192.168.1.1")]
 
 
 def test_settings_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -17,3 +19,24 @@ def test_settings_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
     s = Settings()
     assert s.prefect_api_url == "http://server:4200/api"
     assert s.log_level == "DEBUG"
+
+
+def test_settings_target_groups_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(
+        "TARGET_GROUPS",
+        '[{"name": "nas", "host": "nas.local", "endpoints": ["http://nas.local:5000"]}]',
+    )
+    s = Settings()
+    assert s.target_groups == [
+        TargetGroup(name="nas", host="nas.local", endpoints=["http://nas.local:5000"])
+    ]
+    assert s.target_groups[0].ping is True
+
+
+def test_settings_rejects_duplicate_group_names(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(
+        "TARGET_GROUPS",
+        '[{"name": "nas", "host": "nas.local"}, {"name": "nas", "host": "10.0.0.2"}]',
+    )
+    with pytest.raises(ValidationError, match="duplicate target group names: nas"):
+        Settings()
@@ -0,0 +1,137 @@
+"""Tests for home_prefect tasks."""
+
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from home_prefect.config import Settings
+from home_prefect.history import Sample
+from home_prefect.tasks import network_tasks
+from home_prefect.tasks.history_tasks import record_results
+from home_prefect.tasks.network_tasks import (
+    http_check,
+    http_probe,
+    resolve_addresses,
+    resolve_host,
+)
+
+ADDRINFO = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.5", 0))]
+
+
+@pytest.fixture(autouse=True)
+def _clear_resolve_cache() -> None:
+    network_tasks._resolve_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_resolve_host_caches_within_ttl() -> None:
+    lookup = AsyncMock(return_value=ADDRINFO)
+    with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+        assert await resolve_host("nas.local", ttl=60) == "10.0.0.5"
+        assert await resolve_host("nas.local", ttl=60) == "10.0.0.5"
+
+    assert lookup.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_resolve_host_expires_and_skips_ip_literals() -> None:
+    lookup = AsyncMock(return_value=ADDRINFO)
+    with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+        assert await resolve_host("192.168.1.1") == "192.168.1.1"
+        await resolve_host("nas.local", ttl=0)
+        await resolve_host("nas.local", ttl=0)
+
+    assert lookup.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_addresses_keeps_all_addresses_and_scope_ids() -> None:
+    infos = [
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fe80::1", 0, 0, 3)),
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fe80::1", 0, 0, 3)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.5", 0)),
+    ]
+    with patch("asyncio.BaseEventLoop.getaddrinfo", AsyncMock(return_value=infos)):
+        assert await resolve_addresses("nas.local", ttl=60) == ["fe80::1%3", "10.0.0.5"]
+
+
+def test_transport_installs_resolver_backend() -> None:
+    # Guards the private httpx/httpcore attributes the transport patches.
+    assert hasattr(httpx.AsyncHTTPTransport()._pool, "_network_backend")
+    transport = network_tasks._CachedResolverTransport()
+    assert isinstance(transport._pool._network_backend, network_tasks._CachedResolverBackend)
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    hosts: list[str] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.hosts.append(self.headers["Host"])
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server() -> Iterator[int]:
+    _RecordingHandler.hosts = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_http_check_connects_via_resolver_cache(http_server: int) -> None:
+    # ".invalid" never resolves in DNS, so the request can only succeed
+    # if the connection goes through the cached address.
+    network_tasks._resolve_cache["service.invalid"] = (["127.0.0.1"], time.monotonic() + 60)
+    with patch("home_prefect.tasks.network_tasks.get_run_logger", MagicMock()):
+        status = await http_check.fn(f"http://service.invalid:{http_server}/")
+
+    assert status == 204
+    assert _RecordingHandler.hosts == [f"service.invalid:{http_server}"]
+
+
+@pytest.mark.asyncio
+async def test_http_check_falls_back_to_next_address(http_server: int) -> None:
+    # Nothing listens on 127.0.0.2, so the first connect is refused.
+    addresses = ["127.0.0.2", "127.0.0.1"]
+    network_tasks._resolve_cache["service.invalid"] = (addresses, time.monotonic() + 60)
+    with patch("home_prefect.tasks.network_tasks.get_run_logger", MagicMock()):
+        status = await http_check.fn(f"http://service.invalid:{http_server}/")
+
+    assert status == 204
+
+
+@pytest.mark.asyncio
+async def test_http_probe_times_the_request(http_server: int) -> None:
+    with patch("home_prefect.tasks.network_tasks.get_run_logger", MagicMock()):
+        status, elapsed_ms = await http_probe.fn(f"http://127.0.0.1:{http_server}/")
+
+    assert status == 204
+    assert 0 < elapsed_ms < 10_000
+
+
+@pytest.mark.asyncio
+async def test_record_results_logs_unwritable_history_db(tmp_path: Path) -> None:
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    settings = Settings(history_db=blocker / "history.db")
+    logger = MagicMock()
+    with (
+        patch("home_prefect.tasks.history_tasks.get_settings", return_value=settings),
+        patch("home_prefect.tasks.history_tasks.get_run_logger", return_value=logger),
+    ):
+        await record_results.fn([Sample(kind="ping", target="nas", ok=True)])
+
+    logger.warning.assert_called_once()